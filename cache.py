@@ -0,0 +1,102 @@
+"""
+File-backed TTL cache for weather API responses.
+Entries survive process restarts, so re-runs within the TTL window skip the network.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# WEATHER_CACHE_FILE lets CI point the cache at a path it persists between runs
+CACHE_FILE = os.environ.get("WEATHER_CACHE_FILE") or os.path.join(tempfile.gettempdir(), "weather_bot_cache.json")
+
+# Freshness window in seconds per endpoint
+TTL_MAP = {
+    "onecall": 900,
+    "day_summary": 86400,
+    "open_meteo_archive": 86400,
+    "open_meteo_forecast": 900,
+    "ow_5day": 1800,
+}
+# How long past its TTL an entry may still be served when the upstream fails. Keys
+# include the TR date (a day-old onecall's daily[n] would be shifted by a day), so
+# an entry is unreachable once its day ends; nothing older than a day can be served.
+STALE_TTL = 86400
+
+_LOCK = threading.Lock()
+
+
+def enabled() -> bool:
+    """Return False when WEATHER_NO_CACHE is set, forcing fresh API calls."""
+    return os.environ.get("WEATHER_NO_CACHE", "").strip().lower() not in ("1", "true", "yes")
+
+
+def make_key(endpoint: str, params: dict[str, Any], date: str) -> str:
+    """Hash endpoint, query params (without the API key) and report date into a cache key."""
+    query = "&".join(f"{key}={value}" for key, value in sorted(params.items()) if key != "appid")
+    return hashlib.blake2b(f"{endpoint}|{query}|{date}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _load() -> dict[str, Any]:
+    """Load the cache file, treating a missing or broken file as empty."""
+    try:
+        with open(CACHE_FILE, "rb") as file:
+            raw = file.read()
+        payload = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except (OSError, ValueError):
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def _age(entry: dict[str, Any]) -> float:
+    try:
+        return time.time() - float(entry.get("ts", 0))
+    except (TypeError, ValueError):
+        return float("inf")
+
+
+def get(endpoint: str, key: str) -> dict[str, Any] | None:
+    """Return the entry for key while it is still usable (fresh or within the stale window)."""
+    with _LOCK:
+        entry = _load().get(key)
+    if not isinstance(entry, dict) or _age(entry) >= TTL_MAP[endpoint] + STALE_TTL:
+        return None
+    return entry
+
+
+def is_fresh(endpoint: str, entry: dict[str, Any]) -> bool:
+    """Return True while entry is inside its endpoint's TTL."""
+    return _age(entry) < TTL_MAP[endpoint]
+
+
+def put(key: str, payload: Any, etag: str | None = None, last_modified: str | None = None) -> None:
+    """Store payload under key, pruning entries no endpoint could still use.
+
+    Raises OSError when the cache file cannot be written.
+    """
+    max_age = max(TTL_MAP.values()) + STALE_TTL
+    with _LOCK:
+        entries = {
+            cached_key: entry
+            for cached_key, entry in _load().items()
+            if isinstance(entry, dict) and _age(entry) < max_age
+        }
+        entries[key] = {
+            "ts": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "payload": payload,
+        }
+        raw = orjson.dumps(entries) if orjson is not None else json.dumps(entries, ensure_ascii=False).encode("utf-8")
+        os.makedirs(os.path.dirname(CACHE_FILE) or ".", exist_ok=True)
+        with open(CACHE_FILE, "wb") as file:
+            file.write(raw)
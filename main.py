@@ -6,11 +6,25 @@ Sends yesterday's summary and tomorrow's forecast at 20:00 Turkey time.
 import os
 import sys
 import json
-from datetime import datetime, timedelta
-from typing import Any
+import functools
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
 
 import requests
-from telegram import Bot
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # OpenWeather One Call API 3.0 base URLs
 ONECALL_URL = "https://api.openweathermap.org/data/3.0/onecall"
@@ -18,6 +32,7 @@ DAY_SUMMARY_URL = "https://api.openweathermap.org/data/3.0/onecall/day_summary"
 OPEN_METEO_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
 OPEN_METEO_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
 OPENWEATHER_FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
+TELEGRAM_API_URL = "https://api.telegram.org/bot{token}/{method}"
 
 # Cities: (name, lat, lon)
 CITIES = [
@@ -27,6 +42,8 @@ CITIES = [
 
 # Turkey timezone offset (UTC+3)
 TZ_TURKEY = "+03:00"
+# Turkey has no DST, so a fixed offset from UTC is exact.
+TZ_TR = timezone(timedelta(hours=3))
 MONTHS_TR = [
     "Ocak",
     "Şubat",
@@ -42,12 +59,94 @@ MONTHS_TR = [
     "Aralık",
 ]
 SUBSCRIBERS_FILE = "subscribers.json"
+REPORT_TITLE = "🌤 Nur’cuğum için Hava Durumu 💛❤️"
+REPORT_FOOTER = "✨ Dikkatli git gel güzelim 💛❤️"
+# Shared shape of every per-day report line
+DAY_LINE_FORMAT = "{label} ({day}): {tmin}–{tmax} {emoji} {desc}{stale}"
+NO_DATA_LINE_FORMAT = "{label} ({day}): Veri alınamadı"
+TEMP_FORMAT = "{}°"
+UNKNOWN_TEMP = "?°"
+# Warning emojis indexed by the (rain, cold, hot) bits of a day
+_WARNING_SUFFIXES = ("", " 🔥", " ❄", " ❄ 🔥", " ☔", " ☔ 🔥", " ☔ ❄", " ☔ ❄ 🔥")
 RAIN_THRESHOLD_MM = 1.0
 POP_RAIN_THRESHOLD = 0.60
 
+# Static query params per endpoint; fetchers merge in coordinates and keys.
+_DAY_SUMMARY_BASE_PARAMS = {"units": "metric", "lang": "tr", "tz": TZ_TURKEY}
+_ONECALL_BASE_PARAMS = {"exclude": "minutely,hourly,alerts", "units": "metric", "lang": "tr"}
+_OPENWEATHER_FORECAST_BASE_PARAMS = {"units": "metric", "lang": "tr"}
+_OPEN_METEO_BASE_PARAMS = {"timezone": "Europe/Istanbul"}
+_OM_DAILY_VARS = "temperature_2m_min,temperature_2m_max,precipitation_sum"
+_OM_DAILY_VARS_WITH_CODE = "temperature_2m_min,temperature_2m_max,weather_code,precipitation_sum"
+
+# Open-Meteo WMO weather codes -> Turkish descriptions
+_WMO_CODE_TR = MappingProxyType(
+    {
+        0: "açık",
+        1: "çoğunlukla açık",
+        2: "parçalı bulutlu",
+        3: "kapalı",
+        45: "sisli",
+        48: "kırağılı sis",
+        51: "hafif çiseleme",
+        53: "çiseleme",
+        55: "yoğun çiseleme",
+        61: "hafif yağmur",
+        63: "yağmur",
+        65: "kuvvetli yağmur",
+        71: "hafif kar",
+        73: "kar",
+        75: "yoğun kar",
+        80: "sağanak",
+        81: "kuvvetli sağanak",
+        82: "şiddetli sağanak",
+        95: "gök gürültülü sağanak",
+    }
+)
+# OpenWeather clear/cloud condition ids -> emoji; anything else defaults to 🌤
+_CLOUD_EMOJI_BY_ID = MappingProxyType({800: "🌤", 801: "🌥", 802: "🌥", 803: "☁", 804: "☁"})
+# Shared read-only stand-in for missing or malformed nested objects
+_EMPTY_DICT: Mapping[str, Any] = MappingProxyType({})
+
+HTTP_TIMEOUT = 15
+# Upper bound for concurrent requests; also the per-host connection pool size
+# so worker threads never have to open throwaway connections.
+MAX_PARALLEL_REQUESTS = 8
+STALE_SUFFIX = " (önbellekten)"
+USER_AGENT = "weather-telegram-bot/1.0"
+# Consecutive failures before an endpoint is skipped, and for how long
+CIRCUIT_FAILURE_THRESHOLD = 2
+CIRCUIT_COOLDOWN_SECONDS = 60
+# Local hour (TR) at which DAEMON_MODE sends the daily report
+DAILY_SEND_HOUR = 20
+
+# Shared session so repeated calls to the same host reuse keep-alive connections.
+# requests speaks HTTP/1.1 only; the prefetch threads each hold their own pooled
+# connection, so the handshakes happen in parallel rather than back to back.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=MAX_PARALLEL_REQUESTS,
+        # Exponential backoff on throttling/server errors. Only idempotent methods
+        # are retried on those statuses, so a Telegram sendMessage POST is never resent.
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    ),
+)
+# requests' default Accept-Encoding already includes br once brotli (requirements.txt)
+# is importable; only the agent needs overriding.
+SESSION.headers["User-Agent"] = USER_AGENT
+
 
 def log(msg: str) -> None:
-    print(msg, flush=True)
+    # Single write so lines from fetcher threads never interleave.
+    print(f"{msg}\n", end="", flush=True)
 
 
 def load_subscribers() -> list[int]:
@@ -96,55 +195,218 @@ def add_subscriber(chat_id: int) -> bool:
 
 def register_start_subscribers(token: str) -> None:
     """Read Telegram updates and register users that sent /start."""
-    bot = Bot(token=token)
     try:
-        updates = bot.get_updates(timeout=10)
-    except Exception as exc:
+        updates = _call_telegram(token, "getUpdates", {"timeout": 10})
+    except RuntimeError as exc:
         log(f"Failed to fetch updates for /start handling: {exc}")
         return
 
-    for update in updates:
-        message = getattr(update, "message", None)
-        if not message or not message.text:
+    for update in updates if isinstance(updates, list) else []:
+        message = update.get("message") if isinstance(update, dict) else None
+        if not isinstance(message, dict) or not message.get("text"):
             continue
 
-        if not message.text.strip().startswith("/start"):
+        if not message["text"].strip().startswith("/start"):
             continue
 
-        if add_subscriber(message.chat_id):
-            log(f"Added new subscriber: {message.chat_id}")
+        chat = message.get("chat")
+        chat_id = chat.get("id") if isinstance(chat, dict) else None
+        if chat_id is None:
+            continue
+
+        if add_subscriber(chat_id):
+            log(f"Added new subscriber: {chat_id}")
         else:
-            log(f"Subscriber already exists: {message.chat_id}")
+            log(f"Subscriber already exists: {chat_id}")
+
+
+def _redact_token(exc: Exception, token: str) -> str:
+    """Render an exception without the bot token that request URLs embed."""
+    return str(exc).replace(token, "<BOT_TOKEN>")
+
+
+def _call_telegram(token: str, method: str, payload: dict[str, Any]) -> Any:
+    """Call a Bot API method over the shared session and return its result.
+
+    Raises RuntimeError (with the token redacted) on transport errors or
+    when Telegram answers with ok=false.
+    """
+    try:
+        r = SESSION.post(TELEGRAM_API_URL.format(token=token, method=method), json=payload, timeout=HTTP_TIMEOUT)
+        body = _parse_json(r)
+    except (requests.RequestException, ValueError) as exc:
+        raise RuntimeError(_redact_token(exc, token)) from None
+
+    if not isinstance(body, dict) or not body.get("ok"):
+        description = body.get("description") if isinstance(body, dict) else None
+        raise RuntimeError(f"{method} failed (HTTP {r.status_code}): {description or 'unknown error'}")
+    return body.get("result")
+
+
+def _parse_json(response: requests.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _mark_stale(payload: Any) -> Any:
+    """Tag a cached payload so formatters can show it came from the cache."""
+    if isinstance(payload, dict):
+        payload["stale"] = True
+    elif isinstance(payload, list):
+        for item in payload:
+            _mark_stale(item)
+    return payload
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Skip an endpoint for a cooldown after consecutive failures.
+
+    Once the cooldown has passed the breaker is half-open: exactly one trial
+    call goes through while concurrent callers keep being refused. The trial's
+    outcome either closes the breaker or reopens it for another cooldown.
+    """
+
+    def __init__(self, threshold: int = CIRCUIT_FAILURE_THRESHOLD, cooldown: float = CIRCUIT_COOLDOWN_SECONDS):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.fail_count = 0
+        self.opened_at: float | None = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return False while the breaker is open; after the cooldown a single trial call is let through."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self.trial_in_flight and time.monotonic() - self.opened_at >= self.cooldown:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.fail_count = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.fail_count += 1
+            if self.trial_in_flight or self.fail_count >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+
+_BREAKERS: dict[tuple[str, tuple], CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+# Per-call values that do not change which kind of query is being made
+_LOCATION_PARAMS = frozenset(("lat", "lon", "latitude", "longitude", "appid", "date", "start_date", "end_date"))
+
+
+def _breaker_for(url: str, params: dict[str, Any]) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for one query shape on an endpoint URL.
+
+    The Open-Meteo forecast URL serves the tomorrow batch, the past_days lookup and
+    the today lookup; each gets its own breaker so one failing shape does not shut
+    off the others.
+    """
+    shape = tuple(sorted((key, str(value)) for key, value in params.items() if key not in _LOCATION_PARAMS))
+    with _BREAKERS_LOCK:
+        return _BREAKERS.setdefault((url, shape), CircuitBreaker())
+
+
+def _is_outage(exc: Exception) -> bool:
+    """True for failures that say the endpoint is unreachable or overloaded, not that the request was bad."""
+    if isinstance(exc, requests.HTTPError):
+        status = exc.response.status_code if exc.response is not None else None
+        return status is None or status >= 500 or status == 429
+    return isinstance(exc, requests.RequestException)
+
+
+def _get_json(endpoint: str, url: str, params: dict[str, Any]) -> Any:
+    """GET a JSON endpoint via the shared session, backed by the disk cache.
+
+    Fresh cache entries are returned without a request. Expired entries are
+    revalidated with If-None-Match/If-Modified-Since, so an unchanged
+    resource costs a bodiless 304. When the request fails, the last cached
+    payload is served (tagged as stale) until its hard expiry instead of
+    propagating the error. Endpoints that keep failing are short-circuited
+    by their CircuitBreaker for a cooldown.
+    """
+    use_cache = cache.enabled()
+    key = cache.make_key(endpoint, params, now_turkey().strftime("%Y-%m-%d"))
+    entry = cache.get(endpoint, key) if use_cache else None
+    if entry is not None and cache.is_fresh(endpoint, entry):
+        return entry.get("payload")
+
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    breaker = _breaker_for(url, params)
+    try:
+        if not breaker.allow():
+            raise CircuitOpenError(f"circuit open for {url}; skipping request")
+        try:
+            r = SESSION.get(url, params=params, headers=headers, timeout=HTTP_TIMEOUT)
+            r.raise_for_status()
+            payload = entry.get("payload") if entry is not None and r.status_code == 304 else _parse_json(r)
+        except Exception as exc:
+            # Every outcome must settle the breaker, or a half-open trial would never finish.
+            # A 4xx or an unparsable body still means the endpoint answered.
+            if _is_outage(exc):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+    except (requests.RequestException, ValueError) as exc:
+        if entry is None:
+            raise
+        log(f"Serving stale cached response for {url}: {exc}")
+        return _mark_stale(entry.get("payload"))
+
+    if use_cache:
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        # A 304 confirms the cached version, so its validators stay valid; a 200 body
+        # is a new version and must only carry the validators it was sent with.
+        if r.status_code == 304:
+            etag = etag or entry.get("etag")
+            last_modified = last_modified or entry.get("last_modified")
+        try:
+            cache.put(key, payload, etag=etag, last_modified=last_modified)
+        except OSError as exc:
+            log(f"Failed to save response cache: {exc}")
+    return payload
 
 
 def get_yesterday_date_turkey() -> str:
     """Return yesterday's date in YYYY-MM-DD (Turkey time)."""
-    # Use UTC+3 for Turkey
-    now = datetime.utcnow() + timedelta(hours=3)
-    yesterday = now - timedelta(days=1)
-    return yesterday.strftime("%Y-%m-%d")
+    yesterday = now_turkey() - timedelta(days=1)
+    return f"{yesterday.year:04d}-{yesterday.month:02d}-{yesterday.day:02d}"
 
 
 def now_turkey() -> datetime:
     """Return current datetime in Turkey timezone (UTC+3)."""
-    return datetime.utcnow() + timedelta(hours=3)
+    return datetime.now(TZ_TR)
 
 
 def fetch_yesterday_weather(lat: float, lon: float, api_key: str, date: str) -> dict | None:
     """Fetch yesterday's weather via day_summary endpoint."""
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "date": date,
-        "units": "metric",
-        "lang": "tr",
-        "tz": TZ_TURKEY,
-        "appid": api_key,
-    }
+    params = _DAY_SUMMARY_BASE_PARAMS | {"lat": lat, "lon": lon, "date": date, "appid": api_key}
     try:
-        r = requests.get(DAY_SUMMARY_URL, params=params, timeout=15)
-        r.raise_for_status()
-        return r.json()
+        return _get_json("day_summary", DAY_SUMMARY_URL, params)
     except requests.HTTPError as e:
         body = (e.response.text or "")[:300] if e.response is not None else ""
         log(f"day_summary HTTP error: {e}; response={body}")
@@ -157,55 +419,31 @@ def fetch_yesterday_weather(lat: float, lon: float, api_key: str, date: str) ->
         return None
 
 
-def fetch_tomorrow_forecast(lat: float, lon: float, api_key: str) -> dict | None:
-    """Fetch forecast via onecall, return daily[1] (tomorrow)."""
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "exclude": "minutely,hourly",
-        "units": "metric",
-        "lang": "tr",
-        "appid": api_key,
-    }
-    try:
-        r = requests.get(ONECALL_URL, params=params, timeout=15)
-        r.raise_for_status()
-        data = r.json()
-        daily = data.get("daily", [])
-        if len(daily) < 2:
-            log("onecall: insufficient daily forecast")
-            return None
-        return daily[1]
-    except requests.HTTPError as e:
-        body = (e.response.text or "")[:300] if e.response is not None else ""
-        log(f"onecall HTTP error: {e}; response={body}")
-        return None
-    except requests.RequestException as e:
-        log(f"onecall API error: {e}")
-        return None
-    except (ValueError, KeyError) as e:
-        log(f"onecall parse error: {e}")
-        return None
+def _fetch_onecall(lat: float, lon: float, api_key: str) -> dict:
+    """Fetch the full onecall payload; callers slice daily[n] from this single request."""
+    return _fetch_onecall_memo(round(lat, 4), round(lon, 4), api_key, now_turkey().strftime("%Y-%m-%d %H"))
+
+
+@functools.lru_cache(maxsize=8)
+def _fetch_onecall_memo(lat: float, lon: float, api_key: str, hour_bucket: str) -> dict:
+    """Memoised onecall request; hour_bucket keeps a long-lived process from reusing old forecasts."""
+    params = _ONECALL_BASE_PARAMS | {"lat": lat, "lon": lon, "appid": api_key}
+    data = _get_json("onecall", ONECALL_URL, params)
+    if not isinstance(data, dict):
+        raise ValueError("onecall payload is not an object")
+    return data
 
 
 def fetch_today_tomorrow_forecast(lat: float, lon: float, api_key: str) -> tuple[dict | None, dict | None]:
     """Fetch both today's and tomorrow's daily forecast via onecall."""
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "exclude": "minutely,hourly",
-        "units": "metric",
-        "lang": "tr",
-        "appid": api_key,
-    }
     try:
-        r = requests.get(ONECALL_URL, params=params, timeout=15)
-        r.raise_for_status()
-        data = r.json()
+        data = _fetch_onecall(lat, lon, api_key)
         daily = data.get("daily", [])
         if len(daily) < 2:
             log("onecall: insufficient daily forecast for today/tomorrow")
             return None, None
+        if data.get("stale"):
+            return _mark_stale(daily[0]), _mark_stale(daily[1])
         return daily[0], daily[1]
     except requests.HTTPError as e:
         body = (e.response.text or "")[:300] if e.response is not None else ""
@@ -227,77 +465,70 @@ def _safe_get_daily_value(daily: dict[str, Any], key: str, index: int) -> Any:
     return values[index]
 
 
-def _map_open_meteo_code(code: Any) -> str:
-    weather_map = {
-        0: "açık",
-        1: "çoğunlukla açık",
-        2: "parçalı bulutlu",
-        3: "kapalı",
-        45: "sisli",
-        48: "kırağılı sis",
-        51: "hafif çiseleme",
-        53: "çiseleme",
-        55: "yoğun çiseleme",
-        61: "hafif yağmur",
-        63: "yağmur",
-        65: "kuvvetli yağmur",
-        71: "hafif kar",
-        73: "kar",
-        75: "yoğun kar",
-        80: "sağanak",
-        81: "kuvvetli sağanak",
-        82: "şiddetli sağanak",
-        95: "gök gürültülü sağanak",
+def _coords_params(coords: list[tuple[float, float]]) -> dict[str, str]:
+    """Build Open-Meteo's comma-separated multi-location latitude/longitude params."""
+    return {
+        "latitude": ",".join(str(lat) for lat, _ in coords),
+        "longitude": ",".join(str(lon) for _, lon in coords),
     }
-    return weather_map.get(code, "—")
 
 
-def fetch_open_meteo_yesterday(lat: float, lon: float, date: str) -> dict | None:
-    """Fallback: fetch yesterday summary from Open-Meteo archive API."""
-    params = {
-        "latitude": lat,
-        "longitude": lon,
+def _split_open_meteo_locations(payload: Any, count: int) -> list[dict]:
+    """Return one payload per requested location; Open-Meteo only wraps multiple locations in a list."""
+    locations = payload if isinstance(payload, list) else [payload]
+    if len(locations) != count:
+        raise ValueError(f"expected {count} locations, got {len(locations)}")
+    return [location if isinstance(location, dict) else {} for location in locations]
+
+
+def fetch_open_meteo_yesterday(coords: list[tuple[float, float]], date: str) -> list[dict | None]:
+    """Fallback: fetch yesterday summaries for all coords from one Open-Meteo archive request."""
+    params = _OPEN_METEO_BASE_PARAMS | _coords_params(coords) | {
         "start_date": date,
         "end_date": date,
-        "daily": "temperature_2m_min,temperature_2m_max,precipitation_sum",
-        "timezone": "Europe/Istanbul",
+        "daily": _OM_DAILY_VARS,
     }
     try:
-        r = requests.get(OPEN_METEO_ARCHIVE_URL, params=params, timeout=15)
-        r.raise_for_status()
-        payload = r.json()
-        daily = payload.get("daily", {})
+        payload = _get_json("open_meteo_archive", OPEN_METEO_ARCHIVE_URL, params)
+        locations = _split_open_meteo_locations(payload, len(coords))
+    except (requests.RequestException, ValueError) as e:
+        log(f"open-meteo archive error: {e}")
+        return [None] * len(coords)
+
+    results: list[dict | None] = []
+    for location in locations:
+        daily = location.get("daily", {})
         if not isinstance(daily, dict):
-            return None
+            results.append(None)
+            continue
         tmin = _safe_get_daily_value(daily, "temperature_2m_min", 0)
         tmax = _safe_get_daily_value(daily, "temperature_2m_max", 0)
         precip = _safe_get_daily_value(daily, "precipitation_sum", 0) or 0
         if tmin is None and tmax is None:
-            return None
-        return {
-            "temperature": {"min": tmin, "max": tmax},
-            "precipitation": {"total": precip},
-            "source": "open-meteo-archive",
-        }
-    except (requests.RequestException, ValueError, IndexError) as e:
-        log(f"open-meteo archive error: {e}")
-        return None
+            results.append(None)
+            continue
+        results.append(
+            {
+                "temperature": {"min": tmin, "max": tmax},
+                "precipitation": {"total": precip},
+                "source": "open-meteo-archive",
+                "stale": bool(location.get("stale")),
+            }
+        )
+    return results
 
 
 def fetch_open_meteo_yesterday_from_forecast(lat: float, lon: float) -> dict | None:
     """Second fallback: get yesterday from Open-Meteo forecast API using past_days."""
-    params = {
+    params = _OPEN_METEO_BASE_PARAMS | {
         "latitude": lat,
         "longitude": lon,
-        "daily": "temperature_2m_min,temperature_2m_max,precipitation_sum",
+        "daily": _OM_DAILY_VARS,
         "past_days": 1,
         "forecast_days": 1,
-        "timezone": "Europe/Istanbul",
     }
     try:
-        r = requests.get(OPEN_METEO_FORECAST_URL, params=params, timeout=15)
-        r.raise_for_status()
-        payload = r.json()
+        payload = _get_json("open_meteo_forecast", OPEN_METEO_FORECAST_URL, params)
         daily = payload.get("daily", {})
         if not isinstance(daily, dict):
             return None
@@ -310,28 +541,32 @@ def fetch_open_meteo_yesterday_from_forecast(lat: float, lon: float) -> dict | N
             "temperature": {"min": tmin, "max": tmax},
             "precipitation": {"total": precip},
             "source": "open-meteo-forecast-past",
+            "stale": bool(payload.get("stale")),
         }
     except (requests.RequestException, ValueError, IndexError) as e:
         log(f"open-meteo yesterday-from-forecast error: {e}")
         return None
 
 
-def fetch_open_meteo_tomorrow(lat: float, lon: float) -> dict | None:
-    """Fallback: fetch tomorrow forecast from Open-Meteo forecast API."""
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "daily": "temperature_2m_min,temperature_2m_max,weather_code,precipitation_sum",
+def fetch_open_meteo_tomorrow(coords: list[tuple[float, float]]) -> list[dict | None]:
+    """Fallback: fetch tomorrow forecasts for all coords from one Open-Meteo forecast request."""
+    params = _OPEN_METEO_BASE_PARAMS | _coords_params(coords) | {
+        "daily": _OM_DAILY_VARS_WITH_CODE,
         "forecast_days": 2,
-        "timezone": "Europe/Istanbul",
     }
     try:
-        r = requests.get(OPEN_METEO_FORECAST_URL, params=params, timeout=15)
-        r.raise_for_status()
-        payload = r.json()
-        daily = payload.get("daily", {})
+        payload = _get_json("open_meteo_forecast", OPEN_METEO_FORECAST_URL, params)
+        locations = _split_open_meteo_locations(payload, len(coords))
+    except (requests.RequestException, ValueError) as e:
+        log(f"open-meteo forecast error: {e}")
+        return [None] * len(coords)
+
+    results: list[dict | None] = []
+    for location in locations:
+        daily = location.get("daily", {})
         if not isinstance(daily, dict):
-            return None
+            results.append(None)
+            continue
         tmin = _safe_get_daily_value(daily, "temperature_2m_min", 1)
         tmax = _safe_get_daily_value(daily, "temperature_2m_max", 1)
         code = _safe_get_daily_value(daily, "weather_code", 1)
@@ -339,31 +574,30 @@ def fetch_open_meteo_tomorrow(lat: float, lon: float) -> dict | None:
             code = _safe_get_daily_value(daily, "weathercode", 1)
         precip = _safe_get_daily_value(daily, "precipitation_sum", 1) or 0
         if tmin is None and tmax is None:
-            return None
-        return {
-            "temp": {"min": tmin, "max": tmax},
-            "weather": [{"description": _map_open_meteo_code(code), "id": 500 if precip > 0 else 800}],
-            "rain": {"1h": precip} if precip > 0 else {},
-            "source": "open-meteo-forecast",
-        }
-    except (requests.RequestException, ValueError, IndexError) as e:
-        log(f"open-meteo forecast error: {e}")
-        return None
+            results.append(None)
+            continue
+        results.append(
+            {
+                "temp": {"min": tmin, "max": tmax},
+                "weather": [{"description": _WMO_CODE_TR.get(code, "—"), "id": 500 if precip > 0 else 800}],
+                "rain": {"1h": precip} if precip > 0 else {},
+                "source": "open-meteo-forecast",
+                "stale": bool(location.get("stale")),
+            }
+        )
+    return results
 
 
 def fetch_open_meteo_today(lat: float, lon: float) -> dict | None:
     """Fallback: fetch today's forecast from Open-Meteo forecast API."""
-    params = {
+    params = _OPEN_METEO_BASE_PARAMS | {
         "latitude": lat,
         "longitude": lon,
-        "daily": "temperature_2m_min,temperature_2m_max,weather_code,precipitation_sum",
+        "daily": _OM_DAILY_VARS_WITH_CODE,
         "forecast_days": 1,
-        "timezone": "Europe/Istanbul",
     }
     try:
-        r = requests.get(OPEN_METEO_FORECAST_URL, params=params, timeout=15)
-        r.raise_for_status()
-        payload = r.json()
+        payload = _get_json("open_meteo_forecast", OPEN_METEO_FORECAST_URL, params)
         daily = payload.get("daily", {})
         if not isinstance(daily, dict):
             return None
@@ -377,9 +611,10 @@ def fetch_open_meteo_today(lat: float, lon: float) -> dict | None:
             return None
         return {
             "temp": {"min": tmin, "max": tmax},
-            "weather": [{"description": _map_open_meteo_code(code), "id": 500 if precip > 0 else 800}],
+            "weather": [{"description": _WMO_CODE_TR.get(code, "—"), "id": 500 if precip > 0 else 800}],
             "rain": {"1h": precip} if precip > 0 else {},
             "source": "open-meteo-forecast-today",
+            "stale": bool(payload.get("stale")),
         }
     except (requests.RequestException, ValueError, IndexError) as e:
         log(f"open-meteo today forecast error: {e}")
@@ -388,69 +623,72 @@ def fetch_open_meteo_today(lat: float, lon: float) -> dict | None:
 
 def fetch_openweather_tomorrow_5day(lat: float, lon: float, api_key: str) -> dict | None:
     """Second fallback: use free OpenWeather 5-day/3-hour endpoint for tomorrow."""
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "appid": api_key,
-        "units": "metric",
-        "lang": "tr",
-    }
+    params = _OPENWEATHER_FORECAST_BASE_PARAMS | {"lat": lat, "lon": lon, "appid": api_key}
     try:
-        r = requests.get(OPENWEATHER_FORECAST_URL, params=params, timeout=15)
-        r.raise_for_status()
-        payload = r.json()
+        payload = _get_json("ow_5day", OPENWEATHER_FORECAST_URL, params)
         entries = payload.get("list", [])
         if not isinstance(entries, list) or not entries:
             return None
 
-        now_tr = datetime.utcnow() + timedelta(hours=3)
-        tomorrow_date = (now_tr + timedelta(days=1)).date()
-        tomorrow_entries = []
+        now_tr = now_turkey()
+        tomorrow_iso = (now_tr + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        # Single pass: filter tomorrow's 3-hour slots and aggregate them as we go.
+        # Tomorrow is at most 8 slots per city, so plain Python beats building arrays;
+        # numpy would cost more to import than this loop takes to run.
+        min_temp = None
+        max_temp = None
+        rain_total = 0.0
+        weather_desc = "—"
+        weather_id = 800
+        got_weather = False
         for item in entries:
+            # dt_txt is "YYYY-MM-DD HH:MM:SS"; the date prefix is all we need.
             dt_txt = item.get("dt_txt")
-            if not dt_txt:
-                continue
-            try:
-                dt = datetime.strptime(dt_txt, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
+            if not isinstance(dt_txt, str) or dt_txt[:10] != tomorrow_iso:
                 continue
-            if dt.date() == tomorrow_date:
-                tomorrow_entries.append(item)
 
-        if not tomorrow_entries:
-            return None
+            readings = item.get("main")
+            if isinstance(readings, dict):
+                temp_min = readings.get("temp_min")
+                temp_max = readings.get("temp_max")
+                if temp_min is not None and (min_temp is None or temp_min < min_temp):
+                    min_temp = temp_min
+                if temp_max is not None and (max_temp is None or temp_max > max_temp):
+                    max_temp = temp_max
 
-        min_temp = min((entry.get("main", {}).get("temp_min") for entry in tomorrow_entries if isinstance(entry.get("main"), dict)), default=None)
-        max_temp = max((entry.get("main", {}).get("temp_max") for entry in tomorrow_entries if isinstance(entry.get("main"), dict)), default=None)
-        weather_desc = "—"
-        weather_id = 800
-        for entry in tomorrow_entries:
-            weather = entry.get("weather", [])
-            if weather and isinstance(weather, list):
-                weather_desc = weather[0].get("description", "—")
-                weather_id = weather[0].get("id", 800)
-                break
+            rain = item.get("rain")
+            if isinstance(rain, dict):
+                rain_total += float(rain.get("3h") or 0)
+
+            if not got_weather:
+                weather = item.get("weather")
+                if weather and isinstance(weather, list):
+                    weather_desc = weather[0].get("description", "—")
+                    weather_id = weather[0].get("id", 800)
+                    got_weather = True
 
         if min_temp is None and max_temp is None:
             return None
 
-        rain_total = 0.0
-        for entry in tomorrow_entries:
-            rain = entry.get("rain", {})
-            if isinstance(rain, dict):
-                rain_total += float(rain.get("3h") or 0)
-
         return {
             "temp": {"min": min_temp, "max": max_temp},
             "weather": [{"description": weather_desc, "id": weather_id}],
             "rain": {"1h": rain_total} if rain_total > 0 else {},
             "source": "openweather-5day",
+            "stale": bool(payload.get("stale")),
         }
     except (requests.RequestException, ValueError, TypeError) as e:
         log(f"openweather 5-day forecast fallback error: {e}")
         return None
 
 
+def _dget(data: Mapping[str, Any], key: str) -> Mapping[str, Any]:
+    """Return data[key] when it is a dict, otherwise the shared empty mapping."""
+    value = data.get(key)
+    return value if isinstance(value, dict) else _EMPTY_DICT
+
+
 def has_rain(data: dict, is_day_summary: bool) -> bool:
     def _to_float(value: Any) -> float:
         try:
@@ -459,9 +697,7 @@ def has_rain(data: dict, is_day_summary: bool) -> bool:
             return 0.0
 
     if is_day_summary:
-        prec = data.get("precipitation", {})
-        total = prec.get("total", 0) if isinstance(prec, dict) else 0
-        return _to_float(total) >= RAIN_THRESHOLD_MM
+        return _to_float(_dget(data, "precipitation").get("total")) >= RAIN_THRESHOLD_MM
 
     rain_total = 0.0
     rain_data = data.get("rain")
@@ -471,8 +707,7 @@ def has_rain(data: dict, is_day_summary: bool) -> bool:
     else:
         rain_total += _to_float(rain_data)
 
-    if "precipitation" in data and isinstance(data["precipitation"], dict):
-        rain_total += _to_float(data["precipitation"].get("total"))
+    rain_total += _to_float(_dget(data, "precipitation").get("total"))
 
     if rain_total >= RAIN_THRESHOLD_MM:
         return True
@@ -492,23 +727,20 @@ def _weather_emoji(weather_id: int, has_precipitation: bool) -> str:
         return "🌧"
     if 200 <= weather_id < 300:
         return "⛈"
-    if 800 == weather_id:
-        return "🌤"
-    if weather_id in (801, 802):
-        return "🌥"
-    if weather_id in (803, 804):
-        return "☁"
-    return "🌤"
+    return _CLOUD_EMOJI_BY_ID.get(weather_id, "🌤")
+
+
+def _r(value: float) -> int:
+    """Round half away from zero, so 2.5 shows as 3 and -2.5 as -3 like a thermometer reading."""
+    return int(value + 0.5) if value >= 0 else -int(-value + 0.5)
 
 
 def _format_temp_range(data: dict, key: str) -> tuple[str, str]:
-    temp = data.get(key, {})
-    if not isinstance(temp, dict):
-        temp = {}
+    temp = _dget(data, key)
     tmin = temp.get("min")
     tmax = temp.get("max")
-    tmin_str = f"{round(float(tmin))}°" if tmin is not None else "?°"
-    tmax_str = f"{round(float(tmax))}°" if tmax is not None else "?°"
+    tmin_str = TEMP_FORMAT.format(_r(float(tmin))) if tmin is not None else UNKNOWN_TEMP
+    tmax_str = TEMP_FORMAT.format(_r(float(tmax))) if tmax is not None else UNKNOWN_TEMP
     return tmin_str, tmax_str
 
 
@@ -539,7 +771,8 @@ def format_yesterday_line(data: dict, day_text: str) -> str:
     is_rainy = has_rain(data, True)
     desc = "Hafif yağmur" if is_rainy else "Parçalı bulutlu"
     emoji = "🌧" if is_rainy else "🌥"
-    return f"Dün ({day_text}): {tmin}–{tmax} {emoji} {desc}"
+    stale = STALE_SUFFIX if data.get("stale") else ""
+    return DAY_LINE_FORMAT.format(label="Dün", day=day_text, tmin=tmin, tmax=tmax, emoji=emoji, desc=desc, stale=stale)
 
 
 def format_daily_line(label: str, day_text: str, data: dict) -> str:
@@ -552,24 +785,24 @@ def format_daily_line(label: str, day_text: str, data: dict) -> str:
     if not is_rainy and any(word in desc.lower() for word in ("yağmur", "sağanak", "çisele")):
         desc = _fallback_desc_from_weather_id(wid)
     emoji = _weather_emoji(wid, is_rainy)
-    return f"{label} ({day_text}): {tmin}–{tmax} {emoji} {desc}"
+    stale = STALE_SUFFIX if data.get("stale") else ""
+    return DAY_LINE_FORMAT.format(label=label, day=day_text, tmin=tmin, tmax=tmax, emoji=emoji, desc=desc, stale=stale)
 
 
 def format_warning(today: dict, tomorrow: dict) -> str | None:
-    today_temp = today.get("temp", {}) if isinstance(today.get("temp", {}), dict) else {}
-    tomorrow_temp = tomorrow.get("temp", {}) if isinstance(tomorrow.get("temp", {}), dict) else {}
-    today_max = today_temp.get("max")
-    tomorrow_max = tomorrow_temp.get("max")
+    today_max = _dget(today, "temp").get("max")
+    tomorrow_max = _dget(tomorrow, "temp").get("max")
     if today_max is None or tomorrow_max is None:
         return None
 
-    diff = round(float(today_max) - float(tomorrow_max))
+    # Difference of the rounded maxima, so the warning agrees with the lines above it.
+    diff = _r(float(today_max)) - _r(float(tomorrow_max))
     if diff <= 0:
         return None
 
     rainy_tomorrow = has_rain(tomorrow, False)
     pop = tomorrow.get("pop")
-    pop_text = f" (%{round(float(pop) * 100)})" if pop is not None else ""
+    pop_text = f" (%{_r(float(pop) * 100)})" if pop is not None else ""
     note = "şemsiyeni almayı unutma ☔" if rainy_tomorrow else "biraz kalın giyin 💕"
     return f"⚠ Yarın {diff}° daha soğuk, {note}{pop_text}"
 
@@ -579,40 +812,35 @@ def format_report_header() -> list[str]:
     month_name = MONTHS_TR[now.month - 1]
     return [
         f"🕒 {now.day} {month_name} {now.year} – {now.strftime('%H:%M')}",
-        "🌤 Nur’cuğum için Hava Durumu 💛❤️",
+        REPORT_TITLE,
         "",
     ]
 
 
 def format_yesterday(data: dict, city: str) -> str:
     """Format yesterday's weather from day_summary response."""
-    temp = data.get("temperature", {})
-    if not isinstance(temp, dict):
-        temp = {}
+    temp = _dget(data, "temperature")
     tmin = temp.get("min")
     tmax = temp.get("max")
     if tmin is None and tmax is None:
         return f"  📅 Dün: Veri alınamadı"
 
-    tmin = round(float(tmin)) if tmin is not None else "?"
-    tmax = round(float(tmax)) if tmax is not None else "?"
-    desc = "Yağışlı" if has_rain(data, True) else "Günlük veriler"
+    tmin = _r(float(tmin)) if tmin is not None else "?"
+    tmax = _r(float(tmax)) if tmax is not None else "?"
+    is_rainy = has_rain(data, True)
+    desc = "Yağışlı" if is_rainy else "Günlük veriler"
 
-    parts = [f"  📅 Dün: {tmin}°C - {tmax}°C, {desc}"]
-    if has_rain(data, True):
-        parts.append(" ☔")
-    if isinstance(tmin, (int, float)) and tmin < 5:
-        parts.append(" ❄")
-    if isinstance(tmax, (int, float)) and tmax > 30:
-        parts.append(" 🔥")
-    return "".join(parts)
+    is_cold = isinstance(tmin, (int, float)) and tmin < 5
+    is_hot = isinstance(tmax, (int, float)) and tmax > 30
+    suffix = _WARNING_SUFFIXES[(is_rainy << 2) | (is_cold << 1) | is_hot]
+    if data.get("stale"):
+        suffix += STALE_SUFFIX
+    return f"  📅 Dün: {tmin}°C - {tmax}°C, {desc}{suffix}"
 
 
 def format_tomorrow(data: dict, city: str) -> str:
     """Format tomorrow's forecast from onecall daily[1]."""
-    temp = data.get("temp", {})
-    if not isinstance(temp, dict):
-        temp = {}
+    temp = _dget(data, "temp")
     tmin = temp.get("min")
     tmax = temp.get("max")
     weather = data.get("weather", [{}])
@@ -621,69 +849,204 @@ def format_tomorrow(data: dict, city: str) -> str:
     if tmin is None and tmax is None:
         return f"  📆 Yarın: Veri alınamadı"
 
-    tmin = round(float(tmin)) if tmin is not None else "?"
-    tmax = round(float(tmax)) if tmax is not None else "?"
-    line = f"  📆 Yarın: {tmin}°C - {tmax}°C, {desc}"
+    tmin = _r(float(tmin)) if tmin is not None else "?"
+    tmax = _r(float(tmax)) if tmax is not None else "?"
+    is_rainy = has_rain(data, False)
+    is_cold = isinstance(tmin, (int, float)) and tmin < 5
+    is_hot = isinstance(tmax, (int, float)) and tmax > 30
+    suffix = _WARNING_SUFFIXES[(is_rainy << 2) | (is_cold << 1) | is_hot]
+    if data.get("stale"):
+        suffix += STALE_SUFFIX
+    return f"  📆 Yarın: {tmin}°C - {tmax}°C, {desc}{suffix}"
+
+
+def _future_result(future: Future, description: str) -> Any:
+    """Return a prefetched future's result, degrading to None on failure."""
+    try:
+        return future.result()
+    except Exception as exc:
+        log(f"{description} fetch failed: {exc}")
+        return None
+
+
+def _per_city(
+    executor: ThreadPoolExecutor, fetch: Callable[..., dict | None], *args: Any
+) -> Callable[[list[tuple[float, float]]], list[dict | None]]:
+    """Adapt a single-location fetcher to the batched fallback signature, one request per city in parallel."""
+
+    def fetch_all(coords: list[tuple[float, float]]) -> list[dict | None]:
+        futures = [executor.submit(fetch, lat, lon, *args) for lat, lon in coords]
+        return [_future_result(future, fetch.__name__) for future in futures]
+
+    return fetch_all
+
+
+def _prefetched_batch(
+    speculative: dict[str, Future],
+    slot: str,
+    fetch_batch: Callable[[list[tuple[float, float]]], list[dict | None]],
+) -> Callable[[list[tuple[float, float]]], list[dict | None]]:
+    """Serve a fallback stage from the slot's early-started all-cities batch, or fetch lazily if none was started."""
+    index = {(lat, lon): position for position, (_, lat, lon) in enumerate(CITIES)}
+
+    def pick(coords: list[tuple[float, float]]) -> list[dict | None]:
+        future = speculative.get(slot)
+        if future is None:
+            return fetch_batch(coords)
+        batch = _future_result(future, fetch_batch.__name__) or [None] * len(CITIES)
+        return [batch[index[coord]] for coord in coords]
 
-    warnings = []
-    if has_rain(data, False):
-        warnings.append(" ☔")
-    if isinstance(tmin, (int, float)) and tmin < 5:
-        warnings.append(" ❄")
-    if isinstance(tmax, (int, float)) and tmax > 30:
-        warnings.append(" 🔥")
-    return line + "".join(warnings)
+    return pick
+
+
+def _fill_missing(
+    results: dict[str, dict | None],
+    description: str,
+    fetch_batch: Callable[[list[tuple[float, float]]], list[dict | None]],
+) -> None:
+    """Run a fallback only for the cities that still have no result.
+
+    Fallbacks are applied in order after the primary calls, so a city whose
+    primary (or earlier fallback) succeeded is never looked up again. The
+    first Open-Meteo stage for yesterday/tomorrow may read a batch that
+    collect_weather started early, as soon as a primary for that slot failed.
+    """
+    missing = [(name, lat, lon) for name, lat, lon in CITIES if not results.get(name)]
+    if not missing:
+        return
+
+    log(f"Falling back to {description} ({', '.join(name for name, _, _ in missing)})")
+    batch = fetch_batch([(lat, lon) for _, lat, lon in missing])
+    for (name, _, _), data in zip(missing, batch):
+        results[name] = data
+
+
+def _run_fallbacks(results: dict[str, dict | None], stages: list[tuple[str, Callable]]) -> None:
+    """Apply one slot's fallback stages in order."""
+    for description, fetch_batch in stages:
+        _fill_missing(results, description, fetch_batch)
+
+
+def collect_weather(
+    api_key: str, yesterday: str
+) -> tuple[dict[str, dict | None], dict[str, dict | None], dict[str, dict | None]]:
+    """Fetch yesterday/today/tomorrow data for every city, keyed by city name."""
+    all_coords = [(lat, lon) for _, lat, lon in CITIES]
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_REQUESTS, 2 * len(CITIES))) as executor:
+        # Primary OpenWeather calls are independent, so dispatch them all at once.
+        futures = {}
+        for name, lat, lon in CITIES:
+            futures[executor.submit(fetch_yesterday_weather, lat, lon, api_key, yesterday)] = (name, "yesterday")
+            futures[executor.submit(fetch_today_tomorrow_forecast, lat, lon, api_key)] = (name, "forecast")
+
+        # The first primary to fail for yesterday/tomorrow starts that slot's keyless,
+        # single-request Open-Meteo batch right away instead of after the slowest primary.
+        # A batch is only started when its slot already has a city to fill, so a fully
+        # successful run makes no Open-Meteo calls and nothing is left running on exit.
+        speculative: dict[str, Future] = {}
+        prefetched = {}
+        for future in as_completed(futures):
+            name, kind = key = futures[future]
+            result = prefetched[key] = _future_result(future, f"{kind} ({name})")
+            if kind == "yesterday" and not result and "yesterday" not in speculative:
+                speculative["yesterday"] = executor.submit(fetch_open_meteo_yesterday, all_coords, yesterday)
+            if kind == "forecast" and not (result and result[1]) and "tomorrow" not in speculative:
+                speculative["tomorrow"] = executor.submit(fetch_open_meteo_tomorrow, all_coords)
+
+        yesterday_results = {name: prefetched[(name, "yesterday")] for name, _, _ in CITIES}
+        forecasts = {name: prefetched[(name, "forecast")] or (None, None) for name, _, _ in CITIES}
+        today_results = {name: forecasts[name][0] for name, _, _ in CITIES}
+        tomorrow_results = {name: forecasts[name][1] for name, _, _ in CITIES}
+
+        # Each slot's chain stays sequential; the three slots are independent.
+        slots = [
+            (
+                yesterday_results,
+                [
+                    (
+                        "Open-Meteo archive for yesterday",
+                        _prefetched_batch(
+                            speculative, "yesterday", lambda coords: fetch_open_meteo_yesterday(coords, yesterday)
+                        ),
+                    ),
+                    (
+                        "Open-Meteo forecast(past_days) for yesterday",
+                        _per_city(executor, fetch_open_meteo_yesterday_from_forecast),
+                    ),
+                ],
+            ),
+            (
+                today_results,
+                [("Open-Meteo forecast for today", _per_city(executor, fetch_open_meteo_today))],
+            ),
+            (
+                tomorrow_results,
+                [
+                    (
+                        "Open-Meteo forecast for tomorrow",
+                        _prefetched_batch(speculative, "tomorrow", fetch_open_meteo_tomorrow),
+                    ),
+                    (
+                        "OpenWeather 5-day forecast for tomorrow",
+                        _per_city(executor, fetch_openweather_tomorrow_5day, api_key),
+                    ),
+                ],
+            ),
+        ]
+        with ThreadPoolExecutor(max_workers=len(slots)) as chains:
+            chain_futures = [chains.submit(_run_fallbacks, results, stages) for results, stages in slots]
+            for future in chain_futures:
+                _future_result(future, "fallback chain")
+
+    return yesterday_results, today_results, tomorrow_results
+
+
+def _render_city(
+    name: str,
+    yes_data: dict | None,
+    today_data: dict | None,
+    tom_data: dict | None,
+    day_texts: tuple[str, str, str],
+) -> list[str]:
+    """Render one city's block: heading, yesterday/today/tomorrow lines, optional warning, spacer."""
+    yesterday_text, today_text, tomorrow_text = day_texts
+    city_lines = [
+        f"📍 {name}",
+        format_yesterday_line(yes_data, yesterday_text)
+        if yes_data
+        else NO_DATA_LINE_FORMAT.format(label="Dün", day=yesterday_text),
+        format_daily_line("Bugün", today_text, today_data)
+        if today_data
+        else NO_DATA_LINE_FORMAT.format(label="Bugün", day=today_text),
+    ]
+    if tom_data:
+        city_lines.append(format_daily_line("Yarın", tomorrow_text, tom_data))
+        warning = format_warning(today_data, tom_data) if today_data else None
+        if warning:
+            city_lines.append(warning)
+    else:
+        city_lines.append(NO_DATA_LINE_FORMAT.format(label="Yarın", day=tomorrow_text))
+    city_lines.append("")
+    return city_lines
 
 
 def build_message(api_key: str, yesterday: str) -> str:
     """Build the full Telegram message for all cities."""
-    lines = format_report_header()
-
-    yesterday_text = _format_relative_date(-1)
-    today_text = _format_relative_date(0)
-    tomorrow_text = _format_relative_date(1)
-
-    for name, lat, lon in CITIES:
-        lines.append(f"📍 {name}")
-        yes_data = fetch_yesterday_weather(lat, lon, api_key, yesterday)
-        if not yes_data:
-            log(f"Falling back to Open-Meteo archive for yesterday ({name})")
-            yes_data = fetch_open_meteo_yesterday(lat, lon, yesterday)
-        if not yes_data:
-            log(f"Falling back to Open-Meteo forecast(past_days) for yesterday ({name})")
-            yes_data = fetch_open_meteo_yesterday_from_forecast(lat, lon)
-        if yes_data:
-            lines.append(format_yesterday_line(yes_data, yesterday_text))
-        else:
-            lines.append(f"Dün ({yesterday_text}): Veri alınamadı")
-
-        today_data, tom_data = fetch_today_tomorrow_forecast(lat, lon, api_key)
-        if not today_data:
-            log(f"Falling back to Open-Meteo forecast for today ({name})")
-            today_data = fetch_open_meteo_today(lat, lon)
-        if today_data:
-            lines.append(format_daily_line("Bugün", today_text, today_data))
-        else:
-            lines.append(f"Bugün ({today_text}): Veri alınamadı")
-
-        if not tom_data:
-            log(f"Falling back to Open-Meteo forecast for tomorrow ({name})")
-            tom_data = fetch_open_meteo_tomorrow(lat, lon)
-        if not tom_data:
-            log(f"Falling back to OpenWeather 5-day forecast for tomorrow ({name})")
-            tom_data = fetch_openweather_tomorrow_5day(lat, lon, api_key)
-        if tom_data:
-            lines.append(format_daily_line("Yarın", tomorrow_text, tom_data))
-            if today_data:
-                warning = format_warning(today_data, tom_data)
-                if warning:
-                    lines.append(warning)
-        else:
-            lines.append(f"Yarın ({tomorrow_text}): Veri alınamadı")
-        lines.append("")
+    header = format_report_header()
+    day_texts = (_format_relative_date(-1), _format_relative_date(0), _format_relative_date(1))
+
+    yesterday_results, today_results, tomorrow_results = collect_weather(api_key, yesterday)
+    city_blocks = [
+        _render_city(name, yesterday_results[name], today_results[name], tomorrow_results[name], day_texts)
+        for name, _, _ in CITIES
+    ]
 
-    lines.append("✨ Dikkatli git gel güzelim 💛❤️")
-    return "\n".join(lines).strip()
+    return "\n".join(itertools.chain(header, *city_blocks, (REPORT_FOOTER,))).strip()
+
+
+def send_telegram_message(token: str, chat_id: int, text: str) -> None:
+    """Send a plain-text message via the Bot API sendMessage endpoint on the shared session."""
+    _call_telegram(token, "sendMessage", {"chat_id": chat_id, "text": text})
 
 
 def broadcast_message(message: str) -> bool:
@@ -698,11 +1061,14 @@ def broadcast_message(message: str) -> bool:
         log("No subscribers found; skipping broadcast")
         return False
 
-    bot = Bot(token=token)
+    # Each send is an independent round trip, so deliver to all subscribers concurrently.
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_REQUESTS, len(subscribers))) as executor:
+        futures = {chat_id: executor.submit(send_telegram_message, token, chat_id, message) for chat_id in subscribers}
+
     all_sent = True
-    for chat_id in subscribers:
+    for chat_id, future in futures.items():
         try:
-            bot.send_message(chat_id=chat_id, text=message)
+            future.result()
             log(f"Telegram message sent successfully to {chat_id}")
         except Exception as exc:
             all_sent = False
@@ -710,17 +1076,8 @@ def broadcast_message(message: str) -> bool:
     return all_sent
 
 
-def main() -> None:
-    log("Weather bot starting")
-
-    api_key = os.environ.get("WEATHER_API_KEY")
-    token = os.environ.get("BOT_TOKEN")
-    chat_id = os.environ.get("CHAT_ID")
-
-    if not all((api_key, token)):
-        log("Missing env: WEATHER_API_KEY, BOT_TOKEN")
-        sys.exit(1)
-
+def run_once(api_key: str, token: str, chat_id: str | None) -> bool:
+    """Build today's report and send it to every subscriber; return True on success."""
     register_start_subscribers(token)
 
     if chat_id:
@@ -732,11 +1089,68 @@ def main() -> None:
     msg = build_message(api_key, yesterday)
     if not msg:
         log("Message empty, aborting")
-        sys.exit(1)
+        return False
+
+    return broadcast_message(msg)
+
+
+def _next_send_time() -> datetime:
+    """The next DAILY_SEND_HOUR:00 in Turkey time."""
+    now = now_turkey()
+    target = now.replace(hour=DAILY_SEND_HOUR, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return target
+
+
+def run_daemon(api_key: str, token: str, chat_id: str | None) -> None:
+    """Stay resident and send the report every day at DAILY_SEND_HOUR:00 TR.
+
+    SESSION's pooled connections and the circuit breakers carry over between
+    days instead of being rebuilt on every start. time.sleep() follows the
+    monotonic clock, so a wall-clock step during the wait could wake the loop
+    early; the target is re-checked on waking and each TR date is sent at most once.
+    """
+    last_sent_date = None
+    while True:
+        target = _next_send_time()
+        wait = (target - now_turkey()).total_seconds()
+        log(f"Next report in {wait / 3600:.1f} h")
+        time.sleep(max(wait, 0))
+
+        now = now_turkey()
+        today = now.date().isoformat()
+        if now < target or today == last_sent_date:
+            continue
+        last_sent_date = today
+        try:
+            if run_once(api_key, token, chat_id):
+                log("Daily report sent")
+            else:
+                log("Daily report failed, retrying tomorrow")
+        except Exception as exc:
+            log(f"Daily report crashed: {_redact_token(exc, token)}")
+
 
-    if not broadcast_message(msg):
+def main() -> None:
+    log("Weather bot starting")
+
+    api_key = os.environ.get("WEATHER_API_KEY")
+    token = os.environ.get("BOT_TOKEN")
+    chat_id = os.environ.get("CHAT_ID")
+
+    if not all((api_key, token)):
+        log("Missing env: WEATHER_API_KEY, BOT_TOKEN")
         sys.exit(1)
 
+    try:
+        if os.environ.get("DAEMON_MODE", "").strip().lower() in ("1", "true", "yes"):
+            run_daemon(api_key, token, chat_id)
+        elif not run_once(api_key, token, chat_id):
+            sys.exit(1)
+    finally:
+        SESSION.close()
+
     log("Weather bot finished successfully")
 
 